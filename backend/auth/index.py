@@ -4,27 +4,24 @@ import psycopg2
 import hashlib
 from datetime import datetime
 
+from response import error_response, json_response, options_response, pack, wants_compact
+
+REFERRAL_BONUS = 50
+REFERRALS_MAX_AGE = 60
+REFERRER_COLUMNS = ('rank', 'telegram_id', 'username', 'first_name', 'avatar_emoji', 'referrals_count')
+
 def handler(event: dict, context) -> dict:
     '''API для авторизации через Telegram Mini App и управления пользователями'''
     method = event.get('httpMethod', 'GET')
-    
+
     if method == 'OPTIONS':
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type'
-            },
-            'body': '',
-            'isBase64Encoded': False
-        }
-    
+        return options_response()
+
     try:
         db_url = os.environ.get('DATABASE_URL')
         conn = psycopg2.connect(db_url)
         cur = conn.cursor()
-        
+
         if method == 'POST':
             body = json.loads(event.get('body', '{}'))
             telegram_id = body.get('telegram_id')
@@ -32,48 +29,65 @@ def handler(event: dict, context) -> dict:
             first_name = body.get('first_name', '')
             last_name = body.get('last_name', '')
             referral_code = body.get('referral_code')
-            
+
             if not telegram_id:
-                return {
-                    'statusCode': 400,
-                    'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-                    'body': json.dumps({'error': 'telegram_id required'}),
-                    'isBase64Encoded': False
-                }
-            
+                return error_response('telegram_id required', 400)
+
             user_referral_code = hashlib.md5(str(telegram_id).encode()).hexdigest()[:8]
             avatar_emojis = ['🎮', '🎯', '🚀', '⚡', '🔥', '💎', '🌟', '🎨']
             avatar = avatar_emojis[int(telegram_id) % len(avatar_emojis)]
-            
+
             cur.execute('''
-                INSERT INTO users (telegram_id, username, first_name, last_name, avatar_emoji, referral_code, last_active)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (telegram_id) DO UPDATE SET
-                    username = EXCLUDED.username,
-                    first_name = EXCLUDED.first_name,
-                    last_name = EXCLUDED.last_name,
-                    last_active = EXCLUDED.last_active
-                RETURNING telegram_id, username, first_name, last_name, avatar_emoji, total_score, 
-                          games_played, correct_answers, referral_code, referral_bonus
-            ''', (telegram_id, username, first_name, last_name, avatar, user_referral_code, datetime.now()))
-            
+                WITH referrer AS (
+                    SELECT telegram_id FROM users
+                    WHERE referral_code = %(referral_code)s AND telegram_id <> %(telegram_id)s
+                ),
+                upsert AS (
+                    INSERT INTO users (telegram_id, username, first_name, last_name, avatar_emoji, referral_code,
+                                       last_active, referred_by, referred_at, referral_bonus)
+                    VALUES (%(telegram_id)s, %(username)s, %(first_name)s, %(last_name)s, %(avatar)s,
+                            %(user_referral_code)s, %(last_active)s, (SELECT telegram_id FROM referrer),
+                            CASE WHEN EXISTS (SELECT 1 FROM referrer) THEN %(last_active)s END,
+                            CASE WHEN EXISTS (SELECT 1 FROM referrer) THEN %(bonus)s ELSE 0 END)
+                    ON CONFLICT (telegram_id) DO UPDATE SET
+                        username = EXCLUDED.username,
+                        first_name = EXCLUDED.first_name,
+                        last_name = EXCLUDED.last_name,
+                        last_active = EXCLUDED.last_active,
+                        referred_by = CASE WHEN users.referred_by IS NULL AND COALESCE(users.referral_bonus, 0) = 0
+                                           THEN EXCLUDED.referred_by ELSE users.referred_by END,
+                        referred_at = CASE WHEN users.referred_by IS NULL AND COALESCE(users.referral_bonus, 0) = 0
+                                           THEN EXCLUDED.referred_at ELSE users.referred_at END,
+                        referral_bonus = CASE WHEN users.referred_by IS NULL AND COALESCE(users.referral_bonus, 0) = 0
+                                              THEN EXCLUDED.referral_bonus ELSE users.referral_bonus END
+                    RETURNING telegram_id, username, first_name, last_name, avatar_emoji, total_score,
+                              games_played, correct_answers, referral_code, referral_bonus, referred_by,
+                              referred_at IS NOT NULL AND referred_at = %(last_active)s AS newly_attributed
+                ),
+                credited AS (
+                    UPDATE users SET
+                        referral_bonus = referral_bonus + %(bonus)s,
+                        referrals_count = referrals_count + 1
+                    WHERE telegram_id = (SELECT referred_by FROM upsert WHERE newly_attributed)
+                )
+                SELECT telegram_id, username, first_name, last_name, avatar_emoji, total_score,
+                       games_played, correct_answers, referral_code, referral_bonus
+                FROM upsert
+            ''', {
+                'telegram_id': telegram_id,
+                'username': username,
+                'first_name': first_name,
+                'last_name': last_name,
+                'avatar': avatar,
+                'user_referral_code': user_referral_code,
+                'last_active': datetime.now(),
+                'referral_code': referral_code,
+                'bonus': REFERRAL_BONUS
+            })
+
             user = cur.fetchone()
-            
-            if referral_code and not user[9]:
-                cur.execute('SELECT telegram_id FROM users WHERE referral_code = %s', (referral_code,))
-                referrer = cur.fetchone()
-                if referrer and referrer[0] != telegram_id:
-                    cur.execute('''
-                        UPDATE users SET referred_by = %s, referral_bonus = referral_bonus + 50
-                        WHERE telegram_id = %s
-                    ''', (referrer[0], telegram_id))
-                    cur.execute('''
-                        UPDATE users SET referral_bonus = referral_bonus + 50
-                        WHERE telegram_id = %s
-                    ''', (referrer[0],))
-            
             conn.commit()
-            
+
             response_data = {
                 'telegram_id': user[0],
                 'username': user[1],
@@ -86,47 +100,72 @@ def handler(event: dict, context) -> dict:
                 'referral_code': user[8],
                 'referral_bonus': user[9] if len(user) > 9 else 0
             }
-            
+
             cur.close()
             conn.close()
-            
-            return {
-                'statusCode': 200,
-                'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-                'body': json.dumps(response_data),
-                'isBase64Encoded': False
-            }
-        
+
+            return json_response(response_data, event=event)
+
         elif method == 'GET':
             params = event.get('queryStringParameters', {}) or {}
             telegram_id = params.get('telegram_id')
-            
-            if not telegram_id:
-                return {
-                    'statusCode': 400,
-                    'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-                    'body': json.dumps({'error': 'telegram_id required'}),
-                    'isBase64Encoded': False
+
+            if params.get('action') == 'referrals':
+                try:
+                    limit = max(1, min(int(params.get('limit', 10)), 100))
+                except ValueError:
+                    cur.close()
+                    conn.close()
+                    return error_response('limit must be an integer', 400)
+                referrals_count = 0
+
+                if telegram_id:
+                    cur.execute('SELECT referrals_count FROM users WHERE telegram_id = %s', (telegram_id,))
+                    row = cur.fetchone()
+                    if not row:
+                        cur.close()
+                        conn.close()
+                        return error_response('User not found', 404)
+                    referrals_count = row[0]
+
+                cur.execute('''
+                    SELECT telegram_id, username, first_name, avatar_emoji, referrals_count
+                    FROM users
+                    WHERE referrals_count > 0
+                    ORDER BY referrals_count DESC, telegram_id
+                    LIMIT %s
+                ''', (limit,))
+
+                top = cur.fetchall()
+                cur.close()
+                conn.close()
+
+                response_data = {
+                    'telegram_id': int(telegram_id) if telegram_id else None,
+                    'referrals_count': referrals_count,
+                    'top_referrers': pack(REFERRER_COLUMNS, [
+                        (idx + 1,) + tuple(r) for idx, r in enumerate(top)
+                    ], wants_compact(params))
                 }
-            
+
+                return json_response(response_data, event=event, max_age=REFERRALS_MAX_AGE)
+
+            if not telegram_id:
+                return error_response('telegram_id required', 400)
+
             cur.execute('''
                 SELECT telegram_id, username, first_name, last_name, avatar_emoji, total_score,
                        games_played, correct_answers, referral_code, referral_bonus
                 FROM users WHERE telegram_id = %s
             ''', (telegram_id,))
-            
+
             user = cur.fetchone()
             cur.close()
             conn.close()
-            
+
             if not user:
-                return {
-                    'statusCode': 404,
-                    'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-                    'body': json.dumps({'error': 'User not found'}),
-                    'isBase64Encoded': False
-                }
-            
+                return error_response('User not found', 404)
+
             response_data = {
                 'telegram_id': user[0],
                 'username': user[1],
@@ -139,25 +178,10 @@ def handler(event: dict, context) -> dict:
                 'referral_code': user[8],
                 'referral_bonus': user[9]
             }
-            
-            return {
-                'statusCode': 200,
-                'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-                'body': json.dumps(response_data),
-                'isBase64Encoded': False
-            }
-        
-        return {
-            'statusCode': 405,
-            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({'error': 'Method not allowed'}),
-            'isBase64Encoded': False
-        }
-        
+
+            return json_response(response_data, event=event)
+
+        return error_response('Method not allowed', 405)
+
     except Exception as e:
-        return {
-            'statusCode': 500,
-            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({'error': str(e)}),
-            'isBase64Encoded': False
-        }
+        return error_response(str(e), 500)
@@ -0,0 +1,116 @@
+import base64
+import gzip
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_MIN_BYTES = 1024
+
+JSON_HEADERS = {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'}
+
+
+def dumps(data) -> bytes:
+    '''Сериализует ответ в компактный UTF-8 JSON (orjson, если установлен)'''
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def wants_compact(params: dict) -> bool:
+    '''Клиент запросил колоночный формат списков (?format=compact)'''
+    return params.get('format') == 'compact'
+
+
+def pack(columns: tuple, rows: list, compact: bool = False):
+    '''Список строк: массив объектов или {columns, rows} без повторения ключей'''
+    if compact:
+        return {'columns': list(columns), 'rows': [list(r) for r in rows]}
+    return [dict(zip(columns, r)) for r in rows]
+
+
+def _accepted_encodings(event: dict) -> set:
+    headers = (event or {}).get('headers') or {}
+    value = ''
+    for name, header_value in headers.items():
+        if name.lower() == 'accept-encoding':
+            value = header_value or ''
+            break
+
+    encodings = set()
+    for part in value.split(','):
+        token, _, params = part.partition(';')
+        token = token.strip().lower()
+        quality = params.strip().replace(' ', '')
+        if quality.startswith('q='):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if token:
+            encodings.add(token)
+    return encodings
+
+
+def _compress(raw: bytes, event: dict):
+    if len(raw) < COMPRESS_MIN_BYTES:
+        return None, raw
+
+    encodings = _accepted_encodings(event)
+    if brotli is not None and 'br' in encodings:
+        return 'br', brotli.compress(raw, quality=5)
+    if 'gzip' in encodings or '*' in encodings:
+        return 'gzip', gzip.compress(raw, compresslevel=6)
+    return None, raw
+
+
+def json_response(data, status_code: int = 200, event: dict = None, max_age: int = 0) -> dict:
+    '''Формирует ответ функции; большие тела сжимает по Accept-Encoding'''
+    raw = dumps(data)
+    headers = dict(JSON_HEADERS)
+    if max_age:
+        headers['Cache-Control'] = f'public, max-age={max_age}'
+    if event is not None or max_age:
+        headers['Vary'] = 'Accept-Encoding'
+
+    encoding, payload = _compress(raw, event)
+    if encoding:
+        headers['Content-Encoding'] = encoding
+        return {
+            'statusCode': status_code,
+            'headers': headers,
+            'body': base64.b64encode(payload).decode('ascii'),
+            'isBase64Encoded': True
+        }
+
+    return {
+        'statusCode': status_code,
+        'headers': headers,
+        'body': raw.decode('utf-8'),
+        'isBase64Encoded': False
+    }
+
+
+def error_response(message: str, status_code: int) -> dict:
+    return json_response({'error': message}, status_code)
+
+
+def options_response(methods: str = 'GET, POST, OPTIONS') -> dict:
+    return {
+        'statusCode': 200,
+        'headers': {
+            'Access-Control-Allow-Origin': '*',
+            'Access-Control-Allow-Methods': methods,
+            'Access-Control-Allow-Headers': 'Content-Type'
+        },
+        'body': '',
+        'isBase64Encoded': False
+    }
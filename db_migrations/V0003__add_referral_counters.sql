@@ -0,0 +1,14 @@
+ALTER TABLE users ADD COLUMN referrals_count INT NOT NULL DEFAULT 0;
+ALTER TABLE users ADD COLUMN referred_at TIMESTAMP;
+
+UPDATE users u SET referrals_count = r.invited
+FROM (
+    SELECT referred_by, COUNT(*) AS invited
+    FROM users
+    WHERE referred_by IS NOT NULL
+    GROUP BY referred_by
+) r
+WHERE u.telegram_id = r.referred_by;
+
+CREATE INDEX idx_users_referred_by ON users(referred_by) WHERE referred_by IS NOT NULL;
+CREATE INDEX idx_users_top_referrers ON users(referrals_count DESC, telegram_id) WHERE referrals_count > 0;
@@ -0,0 +1,72 @@
+'''Замер размера ответа и времени сериализации для списочных эндпоинтов.
+
+Запуск: python scripts/bench_response.py
+'''
+import base64
+import json
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend', 'chat'))
+
+import response  # noqa: E402
+
+MESSAGE_COLUMNS = ('id', 'telegram_id', 'message', 'created_at', 'first_name', 'username', 'avatar_emoji')
+
+GZIP_EVENT = {'headers': {'Accept-Encoding': 'gzip'}}
+BR_EVENT = {'headers': {'Accept-Encoding': 'br'}}
+REPEATS = 200
+
+
+def chat_rows(count: int = 100) -> list:
+    start = datetime(2026, 1, 1, 12, 0, 0)
+    return [
+        (1000 + i, 100000000 + i % 8, f'Сообщение номер {i} 🎯', (start + timedelta(seconds=i)).isoformat(),
+         f'Игрок {i % 8}', f'player_{i % 8}', '🎮')
+        for i in range(count)
+    ]
+
+
+def legacy(rows: list) -> dict:
+    return {
+        'statusCode': 200,
+        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+        'body': json.dumps({'messages': [dict(zip(MESSAGE_COLUMNS, r)) for r in rows]}),
+        'isBase64Encoded': False
+    }
+
+
+def current(rows: list, compact: bool, event: dict = None) -> dict:
+    return response.json_response({'messages': response.pack(MESSAGE_COLUMNS, rows, compact)}, event=event)
+
+
+def wire_bytes(result: dict) -> int:
+    '''Размер тела после декодирования шлюзом (isBase64Encoded → исходные байты)'''
+    if result['isBase64Encoded']:
+        return len(base64.b64decode(result['body']))
+    return len(result['body'].encode('utf-8'))
+
+
+def report(name: str, build) -> None:
+    result = build()
+    seconds = timeit.timeit(build, number=REPEATS) / REPEATS
+    print(f'{name:<32} {wire_bytes(result):>8} B {seconds * 1e6:>10.1f} us')
+
+
+def main() -> None:
+    rows = chat_rows()
+    print(f'encoder: {"orjson" if response.orjson else "json"}, brotli: {bool(response.brotli)}')
+    report('json.dumps (legacy)', lambda: legacy(rows))
+    report('objects', lambda: current(rows, False))
+    report('compact', lambda: current(rows, True))
+    report('objects + gzip', lambda: current(rows, False, GZIP_EVENT))
+    report('compact + gzip', lambda: current(rows, True, GZIP_EVENT))
+    if response.brotli is not None:
+        report('objects + br', lambda: current(rows, False, BR_EVENT))
+        report('compact + br', lambda: current(rows, True, BR_EVENT))
+
+
+if __name__ == '__main__':
+    main()
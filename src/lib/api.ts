@@ -18,6 +18,19 @@ export interface User {
   referral_bonus: number;
 }
 
+export interface ReferralStats {
+  telegram_id: number | null;
+  referrals_count: number;
+  top_referrers: Array<{
+    rank: number;
+    telegram_id: number;
+    username?: string;
+    first_name: string;
+    avatar_emoji: string;
+    referrals_count: number;
+  }>;
+}
+
 export interface Room {
   room_id: string;
   creator_telegram_id: number;
@@ -58,6 +71,11 @@ export const api = {
     async getUser(telegramId: number): Promise<User> {
       const response = await fetch(`${API_BASE.auth}?telegram_id=${telegramId}`);
       return response.json();
+    },
+    
+    async getReferrals(telegramId: number, limit = 10): Promise<ReferralStats> {
+      const response = await fetch(`${API_BASE.auth}?action=referrals&telegram_id=${telegramId}&limit=${limit}`);
+      return response.json();
     }
   },
   